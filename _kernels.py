@@ -0,0 +1,72 @@
+"""Batch BMI kernels, compiled with Numba when it is installed"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# weights, heights, thresholds, bmi_out, category_index_out
+_SIGNATURE = 'void(float64[:], float64[:], float64[:], float64[:], uint8[:])'
+
+# Veltkamp splitting constant (2**27 + 1) for exact float64 products
+_SPLIT = 134217729.0
+
+
+def _round2(x):
+    """Round to 2 decimals exactly like Python's round(x, 2)
+
+    round() rounds the exact decimal value of x half-to-even, but x * 100
+    is itself rounded; the product's rounding error (Dekker's two-product,
+    100 splits exactly) decides the cases that land on a half.
+    """
+    product = x * 100.0
+    high = x * _SPLIT
+    x_high = high - (high - x)
+    error = (x_high * 100.0 - product) + (x - x_high) * 100.0
+    scaled = np.rint(product)
+    remainder = product - scaled
+    if remainder == 0.5 and error > 0:
+        scaled += 1.0
+    elif remainder == -0.5 and error < 0:
+        scaled -= 1.0
+    return scaled / 100.0
+
+
+def _round2_array(x):
+    """Vectorized _round2"""
+    product = x * 100.0
+    high = x * _SPLIT
+    x_high = high - (high - x)
+    error = (x_high * 100.0 - product) + (x - x_high) * 100.0
+    scaled = np.rint(product)
+    remainder = product - scaled
+    scaled += (remainder == 0.5) & (error > 0)
+    scaled -= (remainder == -0.5) & (error < 0)
+    return scaled / 100.0
+
+
+def _bmi_batch_numpy(weights, heights, thresh, bmi_out, cat_idx_out):
+    """Vectorized fallback used when Numba is not available"""
+    bmi_out[:] = _round2_array(weights * 10000.0 / (heights * heights))
+    cat_idx_out[:] = np.searchsorted(thresh, bmi_out, side='right')
+
+
+if njit is not None:
+    _round2 = njit('float64(float64)', cache=True, nogil=True)(_round2)
+
+    # An explicit signature compiles at import time, so the first chart
+    # refresh does not pay the JIT warmup
+    @njit(_SIGNATURE, cache=True, nogil=True)
+    def bmi_batch(weights, heights, thresh, bmi_out, cat_idx_out):
+        """Compute rounded BMI and category index for every record in one pass"""
+        for i in range(weights.shape[0]):
+            bmi = _round2(weights[i] * 10000.0 / (heights[i] * heights[i]))
+            bmi_out[i] = bmi
+
+            category = 0
+            while category < thresh.shape[0] and bmi >= thresh[category]:
+                category += 1
+            cat_idx_out[i] = category
+else:
+    bmi_batch = _bmi_batch_numpy
\ No newline at end of file
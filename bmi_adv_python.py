@@ -1,17 +1,30 @@
+# -*- coding: utf-8 -*-
 import tkinter as tk
 from tkinter import ttk, messagebox
+import bisect
 import logging
+import math
 import threading
-import multiprocessing
 import queue
 import time
 from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
 import json
 import os
 
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+
+    def _dumps(obj):
+        """Serialize to compact UTF-8 JSON bytes, matching orjson.dumps"""
+        return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    _loads = json.loads
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -22,55 +35,232 @@ logging.basicConfig(
     ]
 )
 
+# BMI category buckets: index i covers [_THRESH[i-1], _THRESH[i])
+_THRESH = (18.5, 25., 30., 35.)
 
-class BMIProcessor:
-    """CPU-bound BMI calculation using multiprocessing"""
+# Status message for each bucket
+_MESSAGES = (
+    "⚠️ UNDERWEIGHT: You are below the healthy weight range.\nRecommendation: Consider consulting a nutritionist for healthy weight gain.",
+    "✅ NORMAL WEIGHT: Congratulations! You are in the healthy weight range.\nRecommendation: Maintain your current lifestyle with balanced diet and regular exercise.",
+    "⚠️ OVERWEIGHT: You are above the healthy weight range.\nRecommendation: Consider increasing physical activity and adjusting your diet.",
+    "🚨 OBESE: Your weight may pose health risks.\nRecommendation: Consult with a healthcare provider for weight management guidance.",
+    "🚨 SEVERELY OBESE: Immediate medical attention recommended.\nRecommendation: Please consult with a healthcare professional for comprehensive weight management.",
+)
 
-    @staticmethod
-    def calculate_bmi_process(weight, height):
-        """Calculate BMI using multiprocessing for CPU-bound task"""
-        try:
-            height_in_meters = height / 100
-            bmi = weight / (height_in_meters ** 2)
-            return round(bmi, 2)
-        except Exception as e:
-            logging.error(f"BMI calculation error: {e}")
-            return None
+# (label, color, status message) for each bucket, in bucket order
+_CATEGORY_TABLE = tuple(zip(
+    ('Underweight', 'Normal Weight', 'Overweight', 'Obese', 'Severely Obese'),
+    ('lightblue', 'green', 'orange', 'red', 'darkred'),
+    _MESSAGES,
+))
+_COLORS = tuple(color for _, color, _ in _CATEGORY_TABLE)
+
+# Chart reference lines: (BMI, color, label)
+_REFERENCE_LINES = (
+    (18.5, 'green', 'Underweight'),
+    (25, 'yellow', 'Normal'),
+    (30, 'orange', 'Overweight'),
+    (35, 'red', 'Obese'),
+)
+
+# Pixel height of one row in the history view
+_HISTORY_ROW_HEIGHT = 20
+
+_BMI_PREFIX = "BMI: "
+_CATEGORY_PREFIX = "Category: "
+
+
+def _record_epoch(record):
+    """Epoch seconds of a history record; older records only carry the ISO timestamp"""
+    epoch = record.get('ts_epoch')
+    if epoch is None:
+        epoch = datetime.fromisoformat(record['timestamp']).timestamp()
+    return epoch
 
 
 class BMIHistory:
     """IO-bound operations for history management"""
 
-    def __init__(self, filename='bmi_history.json'):
+    def __init__(self, filename='bmi_history.jsonl', legacy_filename='bmi_history.json'):
         self.filename = filename
+        self._cache = None
+        self._mtime = 0
+        self._lock = threading.Lock()
+        self._migrate_legacy(legacy_filename)
 
-    def save_to_history(self, data):
-        """IO-bound operation in separate thread"""
+        # One long-lived writer serializes all appends
+        self._queue = queue.Queue()
+        threading.Thread(target=self._write_loop, daemon=True).start()
 
-        def save_task():
-            try:
-                history = self.load_history()
-                history.append(data)
-                with open(self.filename, 'w') as f:
-                    json.dump(history, f, indent=2)
-                logging.info(f"Saved BMI record: {data}")
-            except Exception as e:
-                logging.error(f"History save error: {e}")
+    def _migrate_legacy(self, legacy_filename):
+        """Convert a JSON-array history file from older versions to JSON Lines once"""
+        try:
+            if legacy_filename and not os.path.exists(self.filename) and os.path.exists(legacy_filename):
+                with open(legacy_filename, 'rb', buffering=0) as f:
+                    history = _loads(f.read() or b'[]')
+                self._rewrite(history)
+                logging.info(f"Migrated {len(history)} records from {legacy_filename}")
+        except Exception as e:
+            logging.error(f"History migration error: {e}")
+
+    def _rewrite(self, history):
+        """Write the full history as JSON Lines, replacing the current file"""
+        with open(self.filename, 'wb') as f:
+            f.writelines(_dumps(record) + b'\n' for record in history)
+
+    def _write_loop(self):
+        """Persistent writer thread: append queued records one at a time, in order"""
+        while True:
+            data = self._queue.get()
+            self._write(data)
+            self._queue.task_done()
+
+    def _write(self, data):
+        """Append one record to the history file"""
+        try:
+            with self._lock:
+                with open(self.filename, 'ab+', buffering=1 << 16) as f:
+                    # Terminate a line torn by an interrupted write so this
+                    # record starts on its own line
+                    line = _dumps(data) + b'\n'
+                    if f.seek(0, os.SEEK_END):
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b'\n':
+                            line = b'\n' + line
+                    f.write(line)
+                # Keep the parsed cache in step with the file we just wrote
+                if self._cache is not None:
+                    self._cache.append(data)
+                    self._mtime = os.stat(self.filename).st_mtime_ns
+            logging.info(f"Saved BMI record: {data}")
+        except Exception as e:
+            logging.error(f"History save error: {e}")
+
+    def save_to_history(self, data):
+        """Queue a record for the background writer thread"""
+        self._queue.put(data)
 
-        threading.Thread(target=save_task, daemon=True).start()
+    def flush(self):
+        """Block until every queued record has been written"""
+        self._queue.join()
 
     def load_history(self):
-        """Load history from file"""
+        """Load history from file, reparsing only when it changed on disk"""
         try:
-            if os.path.exists(self.filename):
-                with open(self.filename, 'r') as f:
-                    return json.load(f)
-            return []
+            with self._lock:
+                if not os.path.exists(self.filename):
+                    return []
+                mtime = os.stat(self.filename).st_mtime_ns
+                if self._cache is not None and mtime == self._mtime:
+                    return self._cache
+                with open(self.filename, 'rb', buffering=0) as f:
+                    data = f.read()
+                if data.lstrip().startswith(b'['):
+                    # Old JSON-array format: convert in place
+                    history = _loads(data)
+                    self._rewrite(history)
+                    mtime = os.stat(self.filename).st_mtime_ns
+                else:
+                    history = []
+                    for number, line in enumerate(data.splitlines(), 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            history.append(_loads(line))
+                        except ValueError as e:
+                            logging.warning(f"Skipping unreadable history line {number}: {e}")
+                self._cache = history
+                self._mtime = mtime
+                return history
         except Exception as e:
             logging.error(f"History load error: {e}")
             return []
 
 
+class BMIHistoryColumnar:
+    """In-memory history kept as parallel NumPy columns for charting"""
+
+    def __init__(self, capacity=64):
+        import numpy as np
+
+        self._n = 0
+        self._cap = capacity
+        self._ts = np.empty(capacity, dtype=np.float64)
+        self._w = np.empty(capacity, dtype=np.float64)
+        self._h = np.empty(capacity, dtype=np.float64)
+        self._bmi = np.empty(capacity, dtype=np.float64)
+        self._cat = np.empty(capacity, dtype=np.uint8)
+        self._thresh = np.array(_THRESH)
+
+    def __len__(self):
+        return self._n
+
+    def _reserve(self, size):
+        """Grow every column by doubling until it holds size records"""
+        if size <= self._cap:
+            return
+        import numpy as np
+
+        capacity = self._cap
+        while capacity < size:
+            capacity *= 2
+        self._ts = np.resize(self._ts, capacity)
+        self._w = np.resize(self._w, capacity)
+        self._h = np.resize(self._h, capacity)
+        self._bmi = np.resize(self._bmi, capacity)
+        self._cat = np.resize(self._cat, capacity)
+        self._cap = capacity
+
+    def extend(self, records):
+        """Append history records, keeping their stored BMI and bucketing it in one batch"""
+        import numpy as np
+
+        rows = []
+        for record in records:
+            try:
+                row = (_record_epoch(record), float(record['weight']), float(record['height']))
+                if not all(map(math.isfinite, row)) or row[1] <= 0 or row[2] <= 0:
+                    raise ValueError("non-finite or non-positive value")
+                bmi = record.get('bmi')
+                rows.append(row + (np.nan if bmi is None else float(bmi),))
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                logging.warning(f"Skipping unreadable history record {record!r}: {e}")
+        if not rows:
+            return
+
+        start = self._n
+        stop = start + len(rows)
+        self._reserve(stop)
+        self._ts[start:stop], self._w[start:stop], self._h[start:stop], self._bmi[start:stop] = zip(*rows)
+
+        # Records without a usable stored BMI are recomputed with the batch kernel
+        missing = np.flatnonzero(~np.isfinite(self._bmi[start:stop])) + start
+        if missing.size:
+            from _kernels import bmi_batch
+
+            bmis = np.empty(missing.size, dtype=np.float64)
+            categories = np.empty(missing.size, dtype=np.uint8)
+            bmi_batch(self._w[missing], self._h[missing], self._thresh, bmis, categories)
+            self._bmi[missing] = bmis
+
+        self._cat[start:stop] = np.searchsorted(self._thresh, self._bmi[start:stop], side='right')
+        self._n = stop
+
+    def append(self, record):
+        """Append a single history record"""
+        self.extend([record])
+
+    def rows(self, start, stop):
+        """Return (epoch seconds, weights, heights, bmis, categories) views of records start:stop"""
+        stop = min(stop, self._n)
+        return self._ts[start:stop], self._w[start:stop], self._h[start:stop], self._bmi[start:stop], self._cat[start:stop]
+
+    def recent(self, count):
+        """Return (epoch seconds, bmis, categories) views of the last count records"""
+        start = max(self._n - count, 0)
+        return self._ts[start:self._n], self._bmi[start:self._n], self._cat[start:self._n]
+
+
 class AdvancedBMICalculator:
     def __init__(self, root):
         self.root = root
@@ -79,11 +269,19 @@ class AdvancedBMICalculator:
         self.root.geometry('800x600')
 
         # Initialize components
-        self.bmi_processor = BMIProcessor()
         self.history_manager = BMIHistory()
+        self.history_columns = None  # Built when the chart is first shown
+        self._columns_waiters = None  # Callbacks waiting on a background load
+        self._columns_pending = []  # Records saved while the background load runs
         self.current_bmi = None
         self.current_category = None
 
+        # History window is created on first use and reused afterwards
+        self._history_window = None
+        self._history_tree = None
+        self._history_scrollbar = None
+        self._history_first = 0
+
         # Style configuration
         self.setup_styles()
 
@@ -116,6 +314,9 @@ class AdvancedBMICalculator:
         # Configure entries
         self.style.configure('TEntry', fieldbackground='#333333', foreground='white')
 
+        # Fixed row height lets the history view compute how many rows fit
+        self.style.configure('Treeview', rowheight=_HISTORY_ROW_HEIGHT)
+
     def create_gui(self):
         """Create the main GUI layout"""
         # Main container
@@ -181,13 +382,11 @@ class AdvancedBMICalculator:
         self.status_label = ttk.Label(self.status_frame, text="", style='Status.TLabel', wraplength=300)
         self.status_label.grid(row=0, column=0, sticky=tk.W)
 
-        # Progress bar
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
-        self.progress.grid(row=4, column=0, sticky=(tk.W, tk.E), pady=5)
-
         # Chart frame (initially hidden)
         self.chart_frame = ttk.Frame(main_frame)
         self.chart_visible = False
+        self.chart_canvas = None
+        self._chart_pending_id = None
 
         # Configure grid weights
         self.root.columnconfigure(0, weight=1)
@@ -206,10 +405,53 @@ class AdvancedBMICalculator:
     def show_chart(self):
         """Show the BMI history chart"""
         if not self.chart_visible:
-            self.chart_frame.grid(row=1, column=1, rowspan=4, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(10, 0))
-            self.setup_chart()
+            self.chart_frame.grid(row=1, column=1, rowspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), padx=(10, 0))
+            if self.chart_canvas is None:
+                self.setup_chart()
             self.chart_visible = True
-            self.update_chart()
+            self._load_history_columns(self.update_chart)
+
+    def _load_history_columns(self, callback):
+        """Run callback once the columnar history exists, building it in a thread on first use"""
+        if self.history_columns is not None:
+            callback()
+            return
+        if self._columns_waiters is not None:
+            self._columns_waiters.append(callback)
+            return
+        self._columns_waiters = [callback]
+
+        def load_task():
+            # NumPy, the kernel and the full-history build all stay off the
+            # main loop; it only receives the finished columns
+            try:
+                import _kernels  # noqa: F401
+
+                # Pending saves must reach the file first or they would be missed
+                self.history_manager.flush()
+                columns = BMIHistoryColumnar()
+                columns.extend(self.history_manager.load_history())
+            except Exception as e:
+                logging.error(f"History load error: {e}")
+                columns = None
+            self.root.after(0, lambda: self._finish_history_columns(columns))
+
+        threading.Thread(target=load_task, daemon=True).start()
+
+    def _finish_history_columns(self, columns):
+        """Install the columns built by the loader thread and run the waiting callbacks"""
+        waiters, self._columns_waiters = self._columns_waiters, None
+        pending, self._columns_pending = self._columns_pending, []
+        if columns is None:
+            messagebox.showerror("Error", "Failed to load history")
+            return
+        # Saves made after the loader read the file are not in the columns yet
+        newest = columns.recent(1)[0]
+        latest = newest[0] if len(newest) else float('-inf')
+        columns.extend([record for record in pending if record['ts_epoch'] > latest])
+        self.history_columns = columns
+        for callback in waiters:
+            callback()
 
     def hide_chart(self):
         """Hide the BMI history chart"""
@@ -218,92 +460,107 @@ class AdvancedBMICalculator:
             self.chart_visible = False
 
     def setup_chart(self):
-        """Setup matplotlib chart for BMI history"""
-        self.fig, self.ax = plt.subplots(figsize=(6, 4), facecolor='black')
-        self.canvas = FigureCanvasTkAgg(self.fig, self.chart_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-        # Style the chart
-        self.ax.set_facecolor('black')
-        self.ax.tick_params(colors='white')
-        self.ax.spines['bottom'].set_color('white')
-        self.ax.spines['top'].set_color('white')
-        self.ax.spines['right'].set_color('white')
-        self.ax.spines['left'].set_color('white')
-        self.ax.title.set_color('white')
-        self.ax.xaxis.label.set_color('white')
-        self.ax.yaxis.label.set_color('white')
-
-        self.ax.set_title('BMI History', color='cyan', fontsize=12, fontweight='bold')
-        self.ax.set_xlabel('Date')
-        self.ax.set_ylabel('BMI')
+        """Setup the Tk canvas chart for BMI history"""
+        self.chart_canvas = tk.Canvas(self.chart_frame, bg='black', width=420, height=300, highlightthickness=0)
+        self.chart_canvas.pack(fill=tk.BOTH, expand=True)
+
+        # Static items (axes, reference lines) are only redrawn when the
+        # BMI range or the canvas size changes
+        self._chart_yrange = None
+        self.chart_canvas.bind('<Configure>', self._on_chart_resize)
+
+    def _on_chart_resize(self, event):
+        """Redraw the whole chart for the new canvas size"""
+        self._chart_yrange = None
+        self.update_chart()
+
+    def _chart_plot_area(self):
+        """Return (left, top, right, bottom) of the plot area in canvas pixels"""
+        width = self.chart_canvas.winfo_width()
+        height = self.chart_canvas.winfo_height()
+        if width <= 1:
+            # Not mapped yet: use the requested size
+            width = int(self.chart_canvas.cget('width'))
+            height = int(self.chart_canvas.cget('height'))
+        return 45, 35, width - 90, height - 40
+
+    def _draw_chart_static(self, ymin, ymax):
+        """Draw title, axes and reference lines for the given BMI range"""
+        canvas = self.chart_canvas
+        canvas.delete('static')
+        left, top, right, bottom = self._chart_plot_area()
+        scale = (bottom - top) / (ymax - ymin)
+
+        canvas.create_text((left + right) / 2, top / 2, text='BMI History', fill='cyan',
+                           font=('Arial', 12, 'bold'), tags='static')
+        canvas.create_rectangle(left, top, right, bottom, outline='white', tags='static')
+        canvas.create_text(left / 2, top - 15, text='BMI', fill='white', font=('Arial', 9), tags='static')
+
+        # Y axis ticks every 5 BMI
+        for value in range(int(ymin), int(ymax) + 1, 5):
+            y = bottom - (value - ymin) * scale
+            canvas.create_line(left - 4, y, left, y, fill='white', tags='static')
+            canvas.create_text(left - 6, y, text=str(value), anchor=tk.E, fill='white',
+                               font=('Arial', 9), tags='static')
+
+        # Reference lines, labelled at the right edge
+        for value, color, label in _REFERENCE_LINES:
+            y = bottom - (value - ymin) * scale
+            canvas.create_line(left, y, right, y, fill=color, dash=(4, 3), tags='static')
+            canvas.create_text(right + 6, y, text=label, anchor=tk.W, fill=color,
+                               font=('Arial', 9), tags='static')
+
+        self._chart_yrange = (ymin, ymax)
 
     def calculate_bmi(self):
-        """Calculate BMI with proper multiprocessing"""
+        """Calculate BMI on the main thread; only the history write is offloaded"""
         try:
             weight = float(self.weight_var.get())
             height = float(self.height_var.get())
 
-            if weight <= 0 or height <= 0:
+            if not (math.isfinite(weight) and math.isfinite(height)) or weight <= 0 or height <= 0:
                 messagebox.showerror("Error", "Please enter valid positive values")
                 return
 
-            # Start progress bar
-            self.progress.start()
-            self.status_label.config(text="Calculating BMI...")
-
-            # Use threading for the calculation process
-            threading.Thread(target=self._calculate_in_thread, args=(weight, height), daemon=True).start()
-
-        except ValueError:
-            messagebox.showerror("Error", "Please enter valid numbers")
-        except Exception as e:
-            logging.error(f"Calculation error: {e}")
-            messagebox.showerror("Error", "An error occurred during calculation")
-            self.progress.stop()
-
-    def _calculate_in_thread(self, weight, height):
-        """Perform calculation in thread"""
-        try:
-            # Simulate CPU-intensive calculation
-            time.sleep(0.5)  # Remove this in production
-
-            # Calculate BMI
-            height_in_meters = height / 100
-            bmi = weight / (height_in_meters ** 2)
+            # Calculate BMI: weight / (height / 100)**2, with the 0.01 folded out
+            bmi = weight * 10000.0 / (height * height)
             bmi_rounded = round(bmi, 2)
 
-            # Determine category
+            # Determine category and show results
             category, color, status_message = self.get_bmi_category(bmi_rounded)
+            self._update_ui_results(bmi_rounded, category, color, status_message)
 
-            # Update UI in main thread
-            self.root.after(0, lambda: self._update_ui_results(bmi_rounded, category, color, status_message))
-
-            # Save to history
+            # Save to history (written on a background thread)
+            now = time.time()
             record = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': datetime.fromtimestamp(now).isoformat(),
+                'ts_epoch': now,
                 'weight': weight,
                 'height': height,
                 'bmi': bmi_rounded,
                 'category': category
             }
             self.history_manager.save_to_history(record)
+            if self.history_columns is not None:
+                self.history_columns.append(record)
+            elif self._columns_waiters is not None:
+                self._columns_pending.append(record)
 
             # Update chart if visible
             if self.chart_visible:
-                self.root.after(0, self.update_chart)
+                self.update_chart()
 
+        except ValueError:
+            messagebox.showerror("Error", "Please enter valid numbers")
         except Exception as e:
-            logging.error(f"Calculation thread error: {e}")
-            self.root.after(0, lambda: messagebox.showerror("Error", "Calculation failed"))
+            logging.error(f"Calculation error: {e}")
+            messagebox.showerror("Error", "An error occurred during calculation")
 
     def _update_ui_results(self, bmi, category, color, status_message):
         """Update UI with results"""
-        self.progress.stop()
-
         # Update BMI and category
-        self.bmi_result.config(text=f"BMI: {bmi}")
-        self.category_result.config(text=f"Category: {category}", foreground=color)
+        self.bmi_result.config(text=_BMI_PREFIX + str(bmi))
+        self.category_result.config(text=_CATEGORY_PREFIX + category, foreground=color)
 
         # Show detailed status message
         self.status_label.config(text=status_message, foreground=color)
@@ -316,21 +573,7 @@ class AdvancedBMICalculator:
 
     def get_bmi_category(self, bmi):
         """Determine BMI category with detailed messages"""
-        if bmi < 18.5:
-            message = "⚠️ UNDERWEIGHT: You are below the healthy weight range.\nRecommendation: Consider consulting a nutritionist for healthy weight gain."
-            return "Underweight", "lightblue", message
-        elif 18.5 <= bmi < 25:
-            message = "✅ NORMAL WEIGHT: Congratulations! You are in the healthy weight range.\nRecommendation: Maintain your current lifestyle with balanced diet and regular exercise."
-            return "Normal Weight", "green", message
-        elif 25 <= bmi < 30:
-            message = "⚠️ OVERWEIGHT: You are above the healthy weight range.\nRecommendation: Consider increasing physical activity and adjusting your diet."
-            return "Overweight", "orange", message
-        elif 30 <= bmi < 35:
-            message = "🚨 OBESE: Your weight may pose health risks.\nRecommendation: Consult with a healthcare provider for weight management guidance."
-            return "Obese", "red", message
-        else:
-            message = "🚨 SEVERELY OBESE: Immediate medical attention recommended.\nRecommendation: Please consult with a healthcare professional for comprehensive weight management."
-            return "Severely Obese", "darkred", message
+        return _CATEGORY_TABLE[bisect.bisect_right(_THRESH, bmi)]
 
     def clear_inputs(self):
         """Clear all input fields and results"""
@@ -339,32 +582,35 @@ class AdvancedBMICalculator:
         self.bmi_result.config(text="BMI: --")
         self.category_result.config(text="Category: --", foreground="white")
         self.status_label.config(text="")
-        self.progress.stop()
         self.current_bmi = None
         self.current_category = None
 
     def show_history(self):
-        """Show history in a new window (IO-bound)"""
+        """Show history in a window backed by the columnar history (loaded in a thread)"""
+        self._load_history_columns(self._display_history)
 
-        def load_and_display():
-            try:
-                history = self.history_manager.load_history()
-                self.root.after(0, lambda: self._display_history(history))
-            except Exception as e:
-                logging.error(f"History display error: {e}")
-                self.root.after(0, lambda: messagebox.showerror("Error", "Failed to load history"))
+    def _display_history(self):
+        """Display history, reusing the history window once it exists"""
+        if self._history_window is None:
+            self._create_history_window()
+        else:
+            self._history_window.deiconify()
+            self._history_window.lift()
 
-        threading.Thread(target=load_and_display, daemon=True).start()
+        # Open on the newest records
+        self._fill_history(len(self.history_columns))
 
-    def _display_history(self, history):
-        """Display history in a new window"""
+    def _create_history_window(self):
+        """Create the history window; closing it only hides it"""
         history_window = tk.Toplevel(self.root)
         history_window.title("BMI History")
         history_window.configure(bg='black')
         history_window.geometry('600x400')
+        history_window.protocol('WM_DELETE_WINDOW', history_window.withdraw)
 
         # Create treeview
-        tree = ttk.Treeview(history_window, columns=('Date', 'Weight', 'Height', 'BMI', 'Category'), show='headings')
+        tree = ttk.Treeview(history_window, columns=('Date', 'Weight', 'Height', 'BMI', 'Category'),
+                            show='headings', selectmode='none')
 
         # Configure columns
         tree.heading('Date', text='Date')
@@ -380,66 +626,127 @@ class AdvancedBMICalculator:
         tree.column('BMI', width=80)
         tree.column('Category', width=120)
 
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(history_window, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
+        # The tree only ever holds the visible rows, so the scrollbar and
+        # the mouse wheel drive _history_first instead of the tree itself
+        scrollbar = ttk.Scrollbar(history_window, orient=tk.VERTICAL, command=self._on_history_scroll)
+        tree.bind('<Configure>', lambda e: self._fill_history(self._history_first))
+        tree.bind('<MouseWheel>', lambda e: self._scroll_history(-1 if e.delta > 0 else 1, 'units'))
+        tree.bind('<Button-4>', lambda e: self._scroll_history(-1, 'units'))
+        tree.bind('<Button-5>', lambda e: self._scroll_history(1, 'units'))
 
         # Pack widgets
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=5)
 
-        # Add data
-        for record in reversed(history[-20:]):  # Show last 20 records
-            date = datetime.fromisoformat(record['timestamp']).strftime('%Y-%m-%d %H:%M')
-            tree.insert('', 0, values=(
-                date,
-                record['weight'],
-                record['height'],
-                record['bmi'],
-                record['category']
+        self._history_window = history_window
+        self._history_tree = tree
+        self._history_scrollbar = scrollbar
+
+    def _history_visible_rows(self):
+        """Number of rows that fit in the history tree"""
+        height = self._history_tree.winfo_height()
+        if height <= 1:
+            # Not mapped yet: use the requested height in rows
+            return int(self._history_tree.cget('height'))
+        # One row's worth of space is taken by the headings
+        return max(1, height // _HISTORY_ROW_HEIGHT - 1)
+
+    def _fill_history(self, first):
+        """Show the visible window of history rows starting at record first"""
+        tree = self._history_tree
+        total = len(self.history_columns)
+        visible = self._history_visible_rows()
+        first = max(0, min(first, total - visible))
+        self._history_first = first
+
+        tree.delete(*tree.get_children())
+        timestamps, weights, heights, bmis, categories = self.history_columns.rows(first, first + visible)
+        for ts, weight, height, bmi, category in zip(timestamps.tolist(), weights.tolist(), heights.tolist(),
+                                                     bmis.tolist(), categories.tolist()):
+            tree.insert('', 'end', values=(
+                time.strftime('%Y-%m-%d %H:%M', time.localtime(ts)),
+                weight,
+                height,
+                f'{bmi:.2f}',
+                _CATEGORY_TABLE[category][0]
             ))
 
-    def update_chart(self):
-        """Update the BMI history chart"""
-        try:
-            history = self.history_manager.load_history()
-
-            self.ax.clear()
-
-            if history:
-                # Prepare data - show last 10 records
-                recent_history = history[-10:]
-                dates = [datetime.fromisoformat(record['timestamp']) for record in recent_history]
-                bmis = [record['bmi'] for record in recent_history]
-
-                # Plot data
-                self.ax.plot(dates, bmis, 'o-', color='cyan', linewidth=2, markersize=6)
-
-                # Add reference lines
-                self.ax.axhline(y=18.5, color='green', linestyle='--', alpha=0.7, label='Underweight')
-                self.ax.axhline(y=25, color='yellow', linestyle='--', alpha=0.7, label='Normal')
-                self.ax.axhline(y=30, color='orange', linestyle='--', alpha=0.7, label='Overweight')
-                self.ax.axhline(y=35, color='red', linestyle='--', alpha=0.7, label='Obese')
+        if total:
+            self._history_scrollbar.set(first / total, min(first + visible, total) / total)
+        else:
+            self._history_scrollbar.set(0, 1)
+
+    def _scroll_history(self, amount, what):
+        """Move the history view by units (rows) or pages"""
+        if what == 'pages':
+            amount *= self._history_visible_rows()
+        self._fill_history(self._history_first + int(amount))
+        return 'break'
+
+    def _on_history_scroll(self, action, *args):
+        """Scrollbar command: translate moveto/scroll into a first visible row"""
+        if action == 'moveto':
+            self._fill_history(round(float(args[0]) * len(self.history_columns)))
+        elif action == 'scroll':
+            self._scroll_history(int(args[0]), args[1])
 
-                self.ax.legend(facecolor='black', labelcolor='white')
+    def update_chart(self):
+        """Schedule a chart refresh, coalescing requests made within 50 ms"""
+        if self._chart_pending_id is not None:
+            self.root.after_cancel(self._chart_pending_id)
+        self._chart_pending_id = self.root.after(50, self._do_update_chart)
 
-            # Style the chart
-            self.ax.set_facecolor('black')
-            self.ax.tick_params(colors='white')
-            for spine in self.ax.spines.values():
-                spine.set_color('white')
-            self.ax.title.set_color('cyan')
-            self.ax.xaxis.label.set_color('white')
-            self.ax.yaxis.label.set_color('white')
+    def _do_update_chart(self):
+        """Update the BMI history chart"""
+        self._chart_pending_id = None
+        if self.history_columns is None:
+            # Still loading; the loader refreshes the chart when done
+            return
+        import numpy as np
 
-            self.ax.set_title('BMI History', fontweight='bold')
-            self.ax.set_xlabel('Date')
-            self.ax.set_ylabel('BMI')
+        try:
+            # Show last 10 records, straight from the columnar history
+            timestamps, bmis, categories = self.history_columns.recent(10)
+            canvas = self.chart_canvas
+
+            # Keep the reference lines in view; widen in steps of 5 so the
+            # static layer rarely needs redrawing
+            ymin, ymax = 15, 40
+            if len(bmis):
+                ymin = min(ymin, 5 * math.floor(bmis.min() / 5))
+                ymax = max(ymax, 5 * math.ceil(bmis.max() / 5))
+            if (ymin, ymax) != self._chart_yrange:
+                self._draw_chart_static(ymin, ymax)
+
+            canvas.delete('dynamic')
+            if not len(bmis):
+                return
 
-            # Format x-axis dates
-            plt.xticks(rotation=45)
-            self.fig.tight_layout()
-            self.canvas.draw()
+            # Map time and BMI to pixels
+            left, top, right, bottom = self._chart_plot_area()
+            span = timestamps[-1] - timestamps[0]
+            if span > 0:
+                xs = left + 10 + (timestamps - timestamps[0]) * ((right - left - 20) / span)
+            else:
+                xs = np.full(len(timestamps), (left + right) / 2)
+            ys = bottom - (bmis - ymin) * ((bottom - top) / (ymax - ymin))
+
+            if len(bmis) > 1:
+                coords = np.column_stack((xs, ys)).ravel().tolist()
+                canvas.create_line(*coords, fill='cyan', width=2, tags='dynamic')
+
+            # Points colored by category
+            for x, y, color in zip(xs.tolist(), ys.tolist(), [_COLORS[category] for category in categories.tolist()]):
+                canvas.create_oval(x - 4, y - 4, x + 4, y + 4, fill=color, outline=color, tags='dynamic')
+
+            # Date labels for the first and last point
+            first = time.strftime('%m-%d %H:%M', time.localtime(timestamps[0]))
+            last = time.strftime('%m-%d %H:%M', time.localtime(timestamps[-1]))
+            canvas.create_text(xs[0], bottom + 12, text=first, anchor=tk.N, fill='white',
+                               font=('Arial', 9), tags='dynamic')
+            if len(bmis) > 1:
+                canvas.create_text(xs[-1], bottom + 12, text=last, anchor=tk.N, fill='white',
+                                   font=('Arial', 9), tags='dynamic')
 
         except Exception as e:
             logging.error(f"Chart update error: {e}")
@@ -457,6 +764,9 @@ def main():
         # Start application
         root.mainloop()
 
+        # Let the writer thread finish any pending saves
+        app.history_manager.flush()
+
     except Exception as e:
         logging.critical(f"Application failed to start: {e}")
         messagebox.showerror("Fatal Error", f"The application failed to start:\n{e}")